@@ -1,16 +1,22 @@
 from fastapi import FastAPI, Response, HTTPException
 import uvicorn
-import bencodepy
 import hashlib
-from datetime import datetime
+from functools import lru_cache
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+import time
 from loguru import logger
 import logging
-import os
+import ssl
+import struct
 from settings import settings
 import sys
 
-# Create logs directory if it doesn't exist
-os.makedirs("logs", exist_ok=True)
+# Fake torrent layout
+ANNOUNCE_URL = b"udp://tracker.opentrackr.org:1337/announce"
+PIECE_LENGTH = 262144  # 256 KB per piece
+FAKE_FILE_SIZE = 1073741824  # 1 GB
+NUM_PIECES = (FAKE_FILE_SIZE + PIECE_LENGTH - 1) // PIECE_LENGTH  # 4096
 
 # Remove default logger
 logger.remove()
@@ -31,31 +37,45 @@ logger.add(
     sys.stderr,
     format=LOG_FORMAT,
     level=settings.LOG_LEVEL,
-    colorize=True,
-    enqueue=True
+    colorize=True
 )
 
-# File logger
+# File logger (loguru creates logs/ and the file on the first write)
 logger.add(
     "logs/server.log",
     format="{level: <8} | {message}",
     level=settings.LOG_LEVEL,
     rotation="500 MB",
     retention="10 days",
-    enqueue=True
+    delay=True
 )
 
-app = FastAPI()
-def log_with_emoji(level: str, message: str, emoji: str):
-    logger.bind(emoji=emoji).log(level, message)
+def log_with_emoji(level: str, message: str, emoji: str, *args):
+    # Arguments are only formatted into the message if a sink accepts the level
+    logger.bind(emoji=emoji).log(level, message, *args)
 
 def log_request(file_name: str, file_type: str):
-    log_with_emoji("REQUEST", f"New request: {file_name}.{file_type}", "📥")
+    log_with_emoji("REQUEST", "New request: {}.{}", "📥", file_name, file_type)
 
 def log_generate(name: str):
-    log_with_emoji("GENERATE", f"Generating: {name}", "🔄")
+    log_with_emoji("GENERATE", "Generating: {}", "🔄", name)
 
-app = FastAPI()
+def log_hash_backend():
+    try:
+        with open("/proc/cpuinfo") as f:
+            sha_ni = "sha_ni" in f.read()
+    except OSError:
+        sha_ni = False
+    log_with_emoji("INFO", "Hashing with {} (SHA-NI: {})", "🔐", ssl.OPENSSL_VERSION, "yes" if sha_ni else "no")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_hash_backend()
+    # Hash the configured infohash up front so no request pays for it
+    _pieces_for(settings.INFOHASH)
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/{file_name}.{file_type}")
 async def get_file(file_name: str, file_type: str):
@@ -75,33 +95,74 @@ async def get_file(file_name: str, file_type: str):
         logger.error(f"Error generating file: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error generating file: {str(e)}")
 
+def _bstr(value: bytes) -> bytes:
+    return b"%d:%s" % (len(value), value)
+
+# Everything up to the creation date value, with keys in bencode (sorted) order
+TORRENT_HEAD = b"".join([
+    b"d",
+    _bstr(b"announce"), _bstr(ANNOUNCE_URL),
+    _bstr(b"announce-list"), b"ll", _bstr(ANNOUNCE_URL), b"ee",
+    _bstr(b"comment"), _bstr(b"Created by Simple Torrent Server"),
+    _bstr(b"created by"), _bstr(b"Simple Torrent Server"),
+    _bstr(b"creation date"),
+])
+# Invariant runs between the per-request values of the info dict
+INFO_HEAD = _bstr(b"info") + b"d" + _bstr(b"length") + b"i%de" % FAKE_FILE_SIZE + _bstr(b"name")
+INFO_PIECES_HEAD = _bstr(b"piece length") + b"i%de" % PIECE_LENGTH + _bstr(b"pieces") + b"%d:" % (NUM_PIECES * 20)
+TORRENT_TAIL = _bstr(b"private") + b"i1e" + b"ee"
+
+def _encode_torrent(name: bytes, pieces: bytes, creation_date: int) -> bytes:
+    """Bencode the fixed torrent layout without walking a dict."""
+    return b"".join([
+        TORRENT_HEAD, b"i%de" % creation_date,
+        INFO_HEAD, _bstr(name),
+        INFO_PIECES_HEAD, pieces,
+        TORRENT_TAIL,
+    ])
+
+# NZB template split around the {file_name}, {current_time}, {file_name} holes
+NZB_HEAD = b"""<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE nzb PUBLIC "-//newzBin//DTD NZB 1.1//EN" "http://www.newzbin.com/DTD/nzb/nzb-1.1.dtd">
+<nzb xmlns="http://www.newzbin.com/DTD/2003/nzb">
+    <head>
+        <meta type="title">"""
+NZB_DATE = b"""</meta>
+        <meta type="date">"""
+NZB_SUBJECT = b"""</meta>
+    </head>
+    <file poster="anonymous@example.com" date="1234567890" subject=\""""
+NZB_TAIL = b""" (1/1)">
+        <groups>
+            <group>alt.binaries.test</group>
+        </groups>
+        <segments>
+            <segment bytes="512000" number="1">fake-segment-id-1</segment>
+            <segment bytes="512000" number="2">fake-segment-id-2</segment>
+        </segments>
+    </file>
+</nzb>"""
+
+@lru_cache(maxsize=1024)
+def _pieces_for(infohash: str) -> bytes:
+    # Generate pieces using infohash as seed; the message buffer is reused and
+    # only its trailing 4-byte big-endian piece index changes per iteration
+    seed = infohash.encode()
+    message = bytearray(seed + bytes(4))
+    pieces = bytearray(NUM_PIECES * 20)
+    for i in range(NUM_PIECES):
+        struct.pack_into(">I", message, len(seed), i)
+        pieces[i * 20:(i + 1) * 20] = hashlib.sha1(message, usedforsecurity=False).digest()
+    return bytes(pieces)
+
 def generate_torrent(torrent_name: str):
     log_generate(torrent_name)
     
-    infohash = settings.INFOHASH
-    piece_length = 262144  # 256 KB per piece
-    fake_file_size = 1073741824  # 1 GB
-    num_pieces = (fake_file_size + piece_length - 1) // piece_length
-    
-    # Generate pieces using infohash as seed
-    all_pieces = b''.join([hashlib.sha1(infohash.encode() + str(i).encode()).digest() for i in range(num_pieces)])
-    
-    torrent_data = {
-        b"announce": b"udp://tracker.opentrackr.org:1337/announce",
-        b"announce-list": [[b"udp://tracker.opentrackr.org:1337/announce"]],
-        b"comment": b"Created by Simple Torrent Server",
-        b"created by": b"Simple Torrent Server",
-        b"creation date": int(datetime.now().timestamp()),
-        b"info": {
-            b"name": torrent_name.encode(),
-            b"piece length": piece_length,
-            b"pieces": all_pieces,
-            b"private": 1,
-            b"length": fake_file_size
-        }
-    }
-
-    torrent_content = bencodepy.encode(torrent_data)
+    torrent_content = _encode_torrent(
+        torrent_name.encode(),
+        _pieces_for(settings.INFOHASH),
+        int(datetime.now().timestamp())
+    )
 
     headers = {
         "Content-Type": "application/x-bittorrent",
@@ -114,26 +175,18 @@ def generate_torrent(torrent_name: str):
         media_type="application/x-bittorrent"
     )
 
+@lru_cache(maxsize=1)
+def _nzb_date(timestamp: int) -> bytes:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC").encode()
+
 def generate_nzb(file_name: str):
-    current_time = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-    
-    nzb_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE nzb PUBLIC "-//newzBin//DTD NZB 1.1//EN" "http://www.newzbin.com/DTD/nzb/nzb-1.1.dtd">
-<nzb xmlns="http://www.newzbin.com/DTD/2003/nzb">
-    <head>
-        <meta type="title">{file_name}</meta>
-        <meta type="date">{current_time}</meta>
-    </head>
-    <file poster="anonymous@example.com" date="1234567890" subject="{file_name} (1/1)">
-        <groups>
-            <group>alt.binaries.test</group>
-        </groups>
-        <segments>
-            <segment bytes="512000" number="1">fake-segment-id-1</segment>
-            <segment bytes="512000" number="2">fake-segment-id-2</segment>
-        </segments>
-    </file>
-</nzb>"""
+    name = file_name.encode()
+    nzb_content = b"".join([
+        NZB_HEAD, name,
+        NZB_DATE, _nzb_date(int(time.time())),
+        NZB_SUBJECT, name,
+        NZB_TAIL
+    ])
 
     headers = {
         "Content-Type": "application/x-nzb",